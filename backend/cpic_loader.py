@@ -14,18 +14,36 @@ Public API:
   load_cpic_data()                      → CPICData singleton
   cpic.phenotype_lookup(gene, diplo)    → "NM" | "PM" | … | "Unknown"
   cpic.drug_gene_lookup(drug)           → "CYP2D6" | … | "Unknown"
+  cpic.drug_gene_lookup_many(drugs)     → [ drug_gene_lookup(d) for d in drugs ]
 
-No ML. No AI. No side-effects beyond reading the two CSV files at startup.
+After a successful parse the resulting maps are written next to the CSVs as
+data/_cpic_precomputed.json; later startups read that file instead of
+re-parsing, for as long as both CSVs, the embedded tables and this module's
+source are unchanged.
+The cache is plain data — it is never imported or executed.
+
+No ML. No AI. No side-effects beyond reading the two CSV files at startup
+and maintaining that precomputed cache.
 """
 
 from __future__ import annotations
 
+import contextlib
 import csv
+import hashlib
+import json
 import logging
+import mmap
+import os
 import re
+import sys
+import tempfile
 from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import Dict, FrozenSet, List, Optional, Tuple, cast
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -132,47 +150,40 @@ _STAR_ALLELE_PHENOTYPES: List[Tuple[str, str, str]] = [
     ("TPMT",   "*2/*3C",      "PM"),
 ]
 
-# PharmGKB drug-name variants we want to capture → normalised name
-_DRUG_NAME_ALIASES: Dict[str, str] = {
-    "codeine":          "CODEINE",
-    "warfarin":         "WARFARIN",
-    "clopidogrel":      "CLOPIDOGREL",
-    "simvastatin":      "SIMVASTATIN",
-    "azathioprine":     "AZATHIOPRINE",
-    "fluorouracil":     "FLUOROURACIL",
-    "mercaptopurine":   "MERCAPTOPURINE",
-    "thioguanine":      "THIOGUANINE",
-    "capecitabine":     "CAPECITABINE",
-    "tegafur":          "TEGAFUR",
-    "tamoxifen":        "TAMOXIFEN",
-    "tramadol":         "TRAMADOL",
-    "amitriptyline":    "AMITRIPTYLINE",
-    "nortriptyline":    "NORTRIPTYLINE",
-    "paroxetine":       "PAROXETINE",
-    "ondansetron":      "ONDANSETRON",
-    "escitalopram":     "ESCITALOPRAM",
-    "citalopram":       "CITALOPRAM",
-    "sertraline":       "SERTRALINE",
-    "voriconazole":     "VORICONAZOLE",
-    "omeprazole":       "OMEPRAZOLE",
-    "pantoprazole":     "PANTOPRAZOLE",
-    "phenytoin":        "PHENYTOIN",
-    "celecoxib":        "CELECOXIB",
-    "atorvastatin":     "ATORVASTATIN",
-    "pravastatin":      "PRAVASTATIN",
-    "rosuvastatin":     "ROSUVASTATIN",
-    "fluvastatin":      "FLUVASTATIN",
-}
+# Drug names (uppercase) we accept from PharmGKB
+_CPIC_DRUG_NAMES: FrozenSet[str] = frozenset(_CPIC_DRUG_GENE)
 
 _TARGET_GENES = {"CYP2D6", "CYP2C19", "CYP2C9", "SLCO1B1", "TPMT", "DPYD"}
 
+# Walk relationships.csv for drugs beyond _CPIC_DRUG_GENE?  Off by default:
+# the override table already covers every drug the scan can accept, so the
+# walk adds nothing.  Set PHARMAGUARD_SCAN_RELATIONSHIPS=1 to re-enable it.
+SCAN_RELATIONSHIPS: bool = os.environ.get(
+    "PHARMAGUARD_SCAN_RELATIONSHIPS", ""
+).strip().lower() in {"1", "true", "yes", "on"}
+
+# A target gene symbol as a whole field of a relationships.csv line
+_REL_GENE_FIELD_RE = re.compile(
+    rb",(?:" + b"|".join(g.encode() for g in sorted(_TARGET_GENES)) + rb"),"
+)
+
+# relationships.csv columns read by _parse_relationships_csv (in unpack order)
+_REL_COLUMNS: Tuple[str, ...] = (
+    "Entity1_name", "Entity1_type", "Entity2_name", "Entity2_type", "Association",
+)
+
 # DPYD phenotype keyword → short code
-_DPYD_PHENOTYPE_MAP = {
-    "poor metabolizer":         "PM",
-    "intermediate metabolizer": "IM",
-    "normal metabolizer":       "NM",
-    "rapid metabolizer":        "RM",
-    "ultrarapid metabolizer":   "UM",
+# Input text is lowercased before matching, so no IGNORECASE flag is needed.
+# "ultrarapid" precedes "rapid" so it is never shadowed by the shorter word.
+_DPYD_PHENOTYPE_RE = re.compile(
+    r"(ultrarapid|intermediate|normal|rapid|poor) metabolizer"
+)
+_DPYD_PHENOTYPE_MAP: Dict[str, str] = {
+    "poor":         "PM",
+    "intermediate": "IM",
+    "normal":       "NM",
+    "rapid":        "RM",
+    "ultrarapid":   "UM",
 }
 
 
@@ -202,6 +213,11 @@ def _normalize_drug(drug: str) -> str:
     return drug.strip().upper()
 
 
+# Raw spelling → canonical diplotype for every embedded star-allele entry
+# (as written, swapped, lowercased).  Filled in below the star-allele map.
+_DIPLO_CANON: Dict[str, str] = {}
+
+
 def _normalize_diplotype(diplotype: str) -> str:
     """Canonicalize diplotype to '*X/*Y' (sorted, uppercased alleles).
 
@@ -211,17 +227,21 @@ def _normalize_diplotype(diplotype: str) -> str:
       '*2A/*1'   → '*1/*2A'
       '*1'       → '*1/*1'
     """
-    diplotype = diplotype.strip()
-    if "/" not in diplotype:
-        allele = diplotype.strip().upper()
-        return f"{allele}/{allele}"
-    parts = [p.strip().upper() for p in diplotype.split("/", 1)]
-    parts.sort()
-    return "/".join(parts)
+    return _DIPLO_CANON.get(diplotype) or _slow_normalize_diplotype(diplotype)
 
 
-def _get_headers_lower(row: dict) -> FrozenSet[str]:
-    return frozenset(k.strip().lower() for k in row.keys())
+@lru_cache(maxsize=4096)
+def _slow_normalize_diplotype(diplotype: str) -> str:
+    diplotype = diplotype.strip()
+    i = diplotype.find("/")
+    if i < 0:
+        allele = diplotype.upper()
+        return allele + "/" + allele
+    a = diplotype[:i].strip().upper()
+    b = diplotype[i + 1:].strip().upper()
+    if a > b:
+        a, b = b, a
+    return a + "/" + b
 
 
 # ---------------------------------------------------------------------------
@@ -229,28 +249,42 @@ def _get_headers_lower(row: dict) -> FrozenSet[str]:
 # ---------------------------------------------------------------------------
 
 
-def _build_star_allele_phenotype_map() -> Dict[str, Dict[str, str]]:
-    """Populate phenotype map from embedded CPIC star-allele constants."""
-    pmap: Dict[str, Dict[str, str]] = {}
-    for gene, diplotype, phenotype in _STAR_ALLELE_PHENOTYPES:
-        norm_gene  = _normalize_gene(gene)
-        norm_diplo = _normalize_diplotype(diplotype)
-        pmap.setdefault(norm_gene, {})[norm_diplo] = phenotype
+# Embedded constants normalised once at import; never mutated afterwards.
+_STAR_ALLELE_PHENOTYPE_MAP: Dict[str, Dict[str, str]] = {}
+for _gene, _diplotype, _phenotype in _STAR_ALLELE_PHENOTYPES:
+    _STAR_ALLELE_PHENOTYPE_MAP.setdefault(_gene.strip().upper(), {})[
+        _normalize_diplotype(_diplotype)
+    ] = _phenotype
+del _gene, _diplotype, _phenotype
+
+for _diplotype in {d for _, d, _ in _STAR_ALLELE_PHENOTYPES}:
+    _canon = _slow_normalize_diplotype(_diplotype)
+    _left, _, _right = _diplotype.partition("/")
+    for _raw in (_diplotype, f"{_right}/{_left}", _canon):
+        _DIPLO_CANON[_raw] = _canon
+        _DIPLO_CANON[_raw.lower()] = _canon
+del _diplotype, _canon, _left, _right, _raw
+
+
+def _iter_star_allele_phenotypes() -> Iterator[Tuple[str, str, str]]:
+    """Yield (gene, diplotype, phenotype) for the embedded CPIC star alleles."""
     logger.debug("Loaded %d embedded star-allele entries.", len(_STAR_ALLELE_PHENOTYPES))
-    return pmap
+    for gene, entries in _STAR_ALLELE_PHENOTYPE_MAP.items():
+        for diplotype, phenotype in entries.items():
+            yield gene, diplotype, phenotype
 
 
-def _parse_dpyd_csv(dpyd_csv: Path) -> Dict[str, Dict[str, str]]:
+def _parse_dpyd_csv(dpyd_csv: Path) -> Iterator[Tuple[str, str, str]]:
     """Parse data/DPYD_Diplotype_Phenotype_Table.csv.
 
     Columns used:
       'DPYD Diplotype' | 'Coded Diplotype/Phenotype Summary'
 
-    Returns:
-        { 'DPYD': { diplotype_key: phenotype_code } }
+    Yields:
+        ('DPYD', diplotype_key, phenotype_code), first occurrence per key only
 
     Raises:
-        CPICDataError on missing file or required columns.
+        CPICDataError (on first iteration) on missing file or required columns.
     """
     if not dpyd_csv.exists():
         raise CPICDataError(
@@ -258,51 +292,76 @@ def _parse_dpyd_csv(dpyd_csv: Path) -> Dict[str, Dict[str, str]]:
             "Expected: data/DPYD_Diplotype_Phenotype_Table.csv"
         )
 
-    dpyd_entries: Dict[str, str] = {}
     try:
-        with open(dpyd_csv, newline="", encoding="utf-8") as fh:
-            reader = csv.DictReader(fh)
-            first_row = next(reader, None)
-            if first_row is None:
-                raise CPICDataError(f"DPYD CSV is empty: {dpyd_csv}")
-
-            headers_lower = _get_headers_lower(first_row)
-            required = {"dpyd diplotype", "coded diplotype/phenotype summary"}
-            missing = required - headers_lower
-            if missing:
-                raise CPICDataError(
-                    f"DPYD CSV missing required columns: {missing}. "
-                    f"Found: {headers_lower}. File: {dpyd_csv}"
-                )
+        lines = dpyd_csv.read_bytes().decode("utf-8").splitlines()
+    except (OSError, UnicodeDecodeError) as exc:
+        raise CPICDataError(f"Cannot read DPYD CSV '{dpyd_csv}': {exc}") from exc
 
-            fh.seek(0)
-            reader = csv.DictReader(fh)
-            for _row in reader:
-                row: Dict[str, str] = cast(Dict[str, str], _row)
-                diplotype_raw: str  = row.get("DPYD Diplotype", "").strip()
-                phenotype_text: str = row.get("Coded Diplotype/Phenotype Summary", "").strip().lower()
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if not header or len(lines) < 2:
+        raise CPICDataError(f"DPYD CSV is empty: {dpyd_csv}")
 
-                if not diplotype_raw or not phenotype_text:
-                    continue
+    # Header row only: column name (case-folded) → position
+    columns = {h.strip().lower(): i for i, h in enumerate(header)}
+    required = {"dpyd diplotype", "coded diplotype/phenotype summary"}
+    missing = required - columns.keys()
+    if missing:
+        raise CPICDataError(
+            f"DPYD CSV missing required columns: {missing}. "
+            f"Found: {frozenset(columns)}. File: {dpyd_csv}"
+        )
 
-                # Map free-text → short code
-                phenotype_code: str = _UNKNOWN
-                for keyword, code in _DPYD_PHENOTYPE_MAP.items():
-                    kw: str = str(keyword)
-                    if kw in phenotype_text:
-                        phenotype_code = code
-                        break
+    i_dip  = columns["dpyd diplotype"]
+    i_phen = columns["coded diplotype/phenotype summary"]
+    min_len = max(i_dip, i_phen) + 1
+
+    seen: Set[str] = set()
+    for row in reader:
+        if len(row) < min_len:
+            continue
+        # First occurrence wins, so skip repeats before touching the phenotype
+        diplotype_raw: str = row[i_dip].strip()
+        if not diplotype_raw or diplotype_raw in seen:
+            continue
+        phenotype_text: str = row[i_phen].strip().lower()
+        if not phenotype_text:
+            continue
+
+        # Map free-text → short code
+        match = _DPYD_PHENOTYPE_RE.search(phenotype_text)
+        phenotype_code: str = (
+            _DPYD_PHENOTYPE_MAP[match.group(1)] if match else _UNKNOWN
+        )
 
-                # Use raw diplotype as key (HGVS notation; not star-allele)
-                if diplotype_raw not in dpyd_entries:
-                    dpyd_entries[diplotype_raw] = phenotype_code
+        # Use raw diplotype as key (HGVS notation; not star-allele)
+        seen.add(diplotype_raw)
+        yield "DPYD", diplotype_raw, phenotype_code
 
+    logger.info("Loaded %d DPYD diplotype entries from %s.", len(seen), dpyd_csv.name)
 
-    except OSError as exc:
-        raise CPICDataError(f"Cannot read DPYD CSV '{dpyd_csv}': {exc}") from exc
 
-    logger.info("Loaded %d DPYD diplotype entries from %s.", len(dpyd_entries), dpyd_csv.name)
-    return {"DPYD": dpyd_entries}
+def _relationship_candidate_lines(mm: mmap.mmap, start: int) -> List[str]:
+    """Return the lines of *mm* (from offset *start*) worth CSV-parsing.
+
+    One compiled bytes regex finds our target gene symbols as whole
+    comma-delimited fields; only the lines holding a hit that also contain
+    "associated" are decoded.  PharmGKB writes the association lowercase and
+    gene symbols uppercase, so the case-sensitive tests lose nothing;
+    "not associated" rows slip through and are dropped by the caller.
+    """
+    lines: List[str] = []
+    last_start = -1
+    for match in _REL_GENE_FIELD_RE.finditer(mm, start):
+        line_start = mm.rfind(b"\n", 0, match.start()) + 1
+        if line_start == last_start:
+            continue
+        last_start = line_start
+        line_end = mm.find(b"\n", match.end())
+        line = mm[line_start:line_end if line_end >= 0 else len(mm)]
+        if b"associated" in line:
+            lines.append(line.rstrip(b"\r").decode("utf-8"))
+    return lines
 
 
 def _parse_relationships_csv(rel_csv: Path) -> Dict[str, str]:
@@ -311,12 +370,14 @@ def _parse_relationships_csv(rel_csv: Path) -> Dict[str, str]:
     We use the CPIC-authoritative override table (_CPIC_DRUG_GENE) as the
     definitive source; PharmGKB is used only to discover any additional
     drugs that might be relevant (currently unused — overrides cover all 28).
+    The file must exist either way, but it is only read when
+    SCAN_RELATIONSHIPS is set.
 
     Returns:
         { DRUG_NAME: GENE }
 
     Raises:
-        CPICDataError on missing file.
+        CPICDataError on missing file or required columns.
     """
     if not rel_csv.exists():
         raise CPICDataError(
@@ -329,39 +390,61 @@ def _parse_relationships_csv(rel_csv: Path) -> Dict[str, str]:
         drug: gene for drug, (gene, _) in _CPIC_DRUG_GENE.items()
     }
 
+    if not SCAN_RELATIONSHIPS:
+        logger.info(
+            "Drug-gene map built: %d entries from CPIC guidelines (%s scan disabled).",
+            len(drug_gene_map), rel_csv.name,
+        )
+        return drug_gene_map
+
     # Scan relationships.csv for any additional Gene↔Chemical associations
     # for our target genes that aren't already in the override table
     try:
-        with open(rel_csv, newline="", encoding="utf-8") as fh:
-            reader = csv.DictReader(fh)
-            for row in reader:
-                e1_name = row.get("Entity1_name", "").strip()
-                e1_type = row.get("Entity1_type", "").strip()
-                e2_name = row.get("Entity2_name", "").strip()
-                e2_type = row.get("Entity2_type", "").strip()
-                association = row.get("Association", "").strip().lower()
-
-                if association != "associated":
-                    continue
-
-                gene = drug_raw = None
-                if e1_type == "Gene" and e2_type == "Chemical":
-                    gene, drug_raw = e1_name.upper(), e2_name.lower()
-                elif e2_type == "Gene" and e1_type == "Chemical":
-                    gene, drug_raw = e2_name.upper(), e1_name.lower()
-                else:
-                    continue
-
-                if gene not in _TARGET_GENES:
-                    continue
-
-                drug = _DRUG_NAME_ALIASES.get(drug_raw)
-                if drug and drug not in drug_gene_map:
-                    drug_gene_map[drug] = gene
+        with open(rel_csv, "rb") as fh:
+            header_line = fh.readline().decode("utf-8")
+            header = [h.strip() for h in next(csv.reader([header_line]), [])]
+            missing = [c for c in _REL_COLUMNS if c not in header]
+            if missing:
+                raise CPICDataError(
+                    f"Relationships CSV missing required columns: {missing}. "
+                    f"File: {rel_csv}"
+                )
+            indices = [header.index(c) for c in _REL_COLUMNS]
+            i_e1_name, i_e1_type, i_e2_name, i_e2_type, i_assoc = indices
+            min_len = max(indices) + 1
 
-    except OSError as exc:
+            with mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                candidates = _relationship_candidate_lines(mm, fh.tell())
+    except (OSError, UnicodeDecodeError) as exc:
         raise CPICDataError(f"Cannot read relationships CSV '{rel_csv}': {exc}") from exc
 
+    for row in csv.reader(candidates):
+        if len(row) < min_len:
+            continue
+        association = row[i_assoc]
+        if association != "associated" and association.strip().lower() != "associated":
+            continue
+
+        # Entity types decide the row; names are normalised only
+        # once a Gene↔Chemical pair on a target gene is confirmed.
+        e1_type = row[i_e1_type].strip()
+        e2_type = row[i_e2_type].strip()
+        if e1_type == "Gene" and e2_type == "Chemical":
+            i_gene, i_drug = i_e1_name, i_e2_name
+        elif e2_type == "Gene" and e1_type == "Chemical":
+            i_gene, i_drug = i_e2_name, i_e1_name
+        else:
+            continue
+
+        gene = row[i_gene].strip().upper()
+        if gene not in _TARGET_GENES:
+            continue
+        drug = row[i_drug].strip().upper()
+        if drug not in _CPIC_DRUG_NAMES:
+            continue
+
+        drug_gene_map.setdefault(drug, gene)
+
     logger.info(
         "Drug-gene map built: %d entries (%d from CPIC guidelines, scanned %s).",
         len(drug_gene_map), len(_CPIC_DRUG_GENE), rel_csv.name,
@@ -369,6 +452,128 @@ def _parse_relationships_csv(rel_csv: Path) -> Dict[str, str]:
     return drug_gene_map
 
 
+# ---------------------------------------------------------------------------
+# Precomputed cache — skips CSV parsing while the source files are unchanged
+# ---------------------------------------------------------------------------
+
+_PRECOMPUTED_NAME = "_cpic_precomputed.json"
+
+# This module's own source; its hash keys the cache to the parser code
+_LOADER_SOURCE = Path(__file__)
+
+_PrecomputedMaps = Tuple[Dict[str, Dict[str, str]], Dict[str, str]]
+
+
+def _source_fingerprint(*paths: Path) -> Optional[List[List[int]]]:
+    """Return [size, mtime_ns] per file, or None if any file cannot be stat'ed."""
+    try:
+        stats = [p.stat() for p in paths]
+    except OSError:
+        return None
+    return [[st.st_size, st.st_mtime_ns] for st in stats]
+
+
+def _embedded_tables_digest() -> str:
+    """SHA-256 over the embedded tables that feed the parsed maps.
+
+    Part of the cache fingerprint, so a deploy that edits the CPIC constants
+    but leaves the CSVs alone still forces a re-parse.
+    """
+    payload = json.dumps(
+        {
+            "drug_gene": _CPIC_DRUG_GENE,
+            "star_alleles": _STAR_ALLELE_PHENOTYPE_MAP,
+            "target_genes": sorted(_TARGET_GENES),
+            "dpyd_phenotypes": [_DPYD_PHENOTYPE_RE.pattern, _DPYD_PHENOTYPE_MAP],
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _loader_source_digest() -> Optional[str]:
+    """SHA-256 of this module's source, or None if it cannot be read.
+
+    Part of the cache fingerprint, so a release that changes only the
+    parsing code still forces a re-parse on hosts that hold a cache.
+    """
+    try:
+        return hashlib.sha256(_LOADER_SOURCE.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def _is_str_map(obj: object) -> bool:
+    return isinstance(obj, dict) and all(
+        isinstance(k, str) and isinstance(v, str) for k, v in obj.items()
+    )
+
+
+def _load_precomputed(path: Path, fingerprint: dict) -> Optional[_PrecomputedMaps]:
+    """Read the precomputed JSON at *path* if it matches *fingerprint*.
+
+    Any problem (absent, unreadable, stale, malformed) returns None so the
+    caller falls back to parsing the CSVs.
+    """
+    if not path.exists():
+        return None
+    try:
+        with open(path, encoding="utf-8") as fh:
+            cached = json.load(fh)
+        if cached["fingerprint"] != fingerprint:
+            logger.info("Precomputed CPIC cache is stale; re-parsing CSVs.")
+            return None
+        phenotype_map = cached["phenotype_map"]
+        drug_gene_map = cached["drug_gene_map"]
+        if not (
+            isinstance(phenotype_map, dict)
+            and all(map(_is_str_map, phenotype_map.values()))
+            and _is_str_map(drug_gene_map)
+        ):
+            raise ValueError("unexpected layout")
+        return phenotype_map, drug_gene_map
+    except (OSError, ValueError, KeyError, TypeError) as exc:
+        logger.warning("Ignoring unreadable precomputed CPIC cache %s: %s", path, exc)
+        return None
+
+
+def _write_precomputed(
+    path: Path,
+    fingerprint: dict,
+    phenotype_map: Dict[str, Dict[str, str]],
+    drug_gene_map: Dict[str, str],
+) -> None:
+    """Write the parsed maps to *path* as JSON; failures only warn.
+
+    Each writer fills its own temp file in the same directory and publishes
+    it with os.replace, so workers starting together never see (or publish)
+    a half-written cache.
+    """
+    tmp: Optional[str] = None
+    try:
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(
+                {
+                    "fingerprint": fingerprint,
+                    "phenotype_map": phenotype_map,
+                    "drug_gene_map": drug_gene_map,
+                },
+                fh,
+            )
+        os.chmod(tmp, 0o644)  # mkstemp creates 0600
+        os.replace(tmp, path)
+        tmp = None
+    except OSError as exc:
+        logger.warning("Could not write precomputed CPIC cache %s: %s", path, exc)
+        return
+    finally:
+        if tmp is not None:
+            with contextlib.suppress(OSError):
+                os.unlink(tmp)
+    logger.info("Wrote precomputed CPIC cache: %s", path)
+
+
 # ---------------------------------------------------------------------------
 # Public data container
 # ---------------------------------------------------------------------------
@@ -381,31 +586,70 @@ class CPICData:
     Attributes:
         _phenotype_map:  { GENE: { DIPLOTYPE: phenotype_string } }
         _drug_gene_map:  { DRUG: gene_string }
+        _flat_phenotypes: { (GENE, DIPLOTYPE): phenotype_string } — derived
+        _canonical_phenotypes: the _flat_phenotypes entries whose keys are
+                          already normalised — derived; serves the fast path
     """
 
-    _phenotype_map: Dict[str, Dict[str, str]] = field(repr=False)
-    _drug_gene_map: Dict[str, str]            = field(repr=False)
+    _phenotype_map: Mapping[str, Mapping[str, str]] = field(repr=False)
+    _drug_gene_map: Mapping[str, str]               = field(repr=False)
+    _flat_phenotypes: Dict[Tuple[str, str], str] = field(
+        init=False, repr=False, compare=False
+    )
+    _canonical_phenotypes: Dict[Tuple[str, str], str] = field(
+        init=False, repr=False, compare=False
+    )
+    _sorted_genes: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+    _sorted_drugs: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        flat = {
+            (gene, diplo): phenotype
+            for gene, sub in self._phenotype_map.items()
+            for diplo, phenotype in sub.items()
+        }
+        object.__setattr__(self, "_flat_phenotypes", flat)
+        # Only keys that normalise to themselves may skip normalisation: DPYD
+        # diplotypes are stored as written in the CSV, so they never qualify.
+        # Checked with the uncached normaliser so those ~3.5k keys, never
+        # queried as such, do not crowd real VCF diplotypes out of its LRU.
+        normalize_diplotype = _slow_normalize_diplotype.__wrapped__
+        object.__setattr__(self, "_canonical_phenotypes", {
+            (gene, diplo): phenotype
+            for (gene, diplo), phenotype in flat.items()
+            if gene == _normalize_gene(gene) and diplo == normalize_diplotype(diplo)
+        })
+        object.__setattr__(self, "_sorted_genes", tuple(sorted(self._phenotype_map)))
+        object.__setattr__(self, "_sorted_drugs", tuple(sorted(self._drug_gene_map)))
 
     def phenotype_lookup(self, gene: str, diplotype: str) -> str:
         """Return phenotype for (gene, diplotype) pair → "NM"|"PM"|…|"Unknown"."""
+        # Fast path: already-canonical input hits the canonical map directly
+        result = self._canonical_phenotypes.get((gene, diplotype))
+        if result is not None:
+            return result
         norm_gene  = _normalize_gene(gene)
         norm_diplo = _normalize_diplotype(diplotype)
-        result = self._phenotype_map.get(norm_gene, {}).get(norm_diplo, _UNKNOWN)
-        logger.debug("phenotype_lookup(%s, %s) → %s", norm_gene, norm_diplo, result)
-        return result
+        return self._flat_phenotypes.get((norm_gene, norm_diplo), _UNKNOWN)
 
     def drug_gene_lookup(self, drug: str) -> str:
         """Return primary pharmacogene for drug → "CYP2D6"|…|"Unknown"."""
         norm_drug = _normalize_drug(drug)
         result = self._drug_gene_map.get(norm_drug, _UNKNOWN)
-        logger.debug("drug_gene_lookup(%s) → %s", norm_drug, result)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("drug_gene_lookup(%s) → %s", norm_drug, result)
         return result
 
-    def all_genes(self) -> list:
-        return sorted(self._phenotype_map.keys())
+    def drug_gene_lookup_many(self, drugs: Sequence[str]) -> List[str]:
+        """Batch form of drug_gene_lookup(); one result per input, same order."""
+        get = self._drug_gene_map.get
+        return [get(drug.strip().upper(), _UNKNOWN) for drug in drugs]
+
+    def all_genes(self) -> Tuple[str, ...]:
+        return self._sorted_genes
 
-    def all_drugs(self) -> list:
-        return sorted(self._drug_gene_map.keys())
+    def all_drugs(self) -> Tuple[str, ...]:
+        return self._sorted_drugs
 
     def summary(self) -> dict:
         return {
@@ -452,21 +696,48 @@ def load_cpic_data(data_dir: Optional[object] = None) -> CPICData:
     dpyd_csv = data_dir / "DPYD_Diplotype_Phenotype_Table.csv"
     rel_csv  = data_dir / "relationships.csv"
 
-    logger.info("Loading CPIC data from: %s", data_dir)
-
-    # 1. Non-DPYD phenotypes from embedded constants
-    phenotype_map = _build_star_allele_phenotype_map()
+    precomputed = data_dir / _PRECOMPUTED_NAME
 
-    # 2. DPYD phenotypes from real CPIC CSV
-    dpyd_map = _parse_dpyd_csv(dpyd_csv)
-    phenotype_map.update(dpyd_map)
-
-    # 3. Drug → Gene from PharmGKB relationships + CPIC overrides
-    drug_gene_map = _parse_relationships_csv(rel_csv)
+    logger.info("Loading CPIC data from: %s", data_dir)
 
+    stats = _source_fingerprint(dpyd_csv, rel_csv)
+    loader_digest = _loader_source_digest()
+    fingerprint = {
+        "scan_relationships": SCAN_RELATIONSHIPS,
+        "sources": stats,
+        "embedded": _embedded_tables_digest(),
+        "loader": loader_digest,
+    } if stats and loader_digest else None
+    cached = _load_precomputed(precomputed, fingerprint) if fingerprint else None
+    if cached is not None:
+        logger.info("Using precomputed CPIC cache: %s", precomputed)
+        phenotype_map, drug_gene_map = cached
+    else:
+        # 1. Non-DPYD phenotypes from embedded constants, then
+        # 2. DPYD phenotypes from real CPIC CSV — merged in a single pass
+        phenotype_map: Dict[str, Dict[str, str]] = {}
+        for gene, diplotype, phenotype in chain(
+            _iter_star_allele_phenotypes(), _parse_dpyd_csv(dpyd_csv)
+        ):
+            phenotype_map.setdefault(gene, {})[diplotype] = phenotype
+
+        # 3. Drug → Gene from PharmGKB relationships + CPIC overrides
+        drug_gene_map = _parse_relationships_csv(rel_csv)
+
+        if fingerprint is not None:
+            _write_precomputed(precomputed, fingerprint, phenotype_map, drug_gene_map)
+
+    # 4. Freeze: read-only views over interned keys/values
     _cpic_singleton = CPICData(
-        _phenotype_map=phenotype_map,
-        _drug_gene_map=drug_gene_map,
+        _phenotype_map=MappingProxyType({
+            sys.intern(gene): MappingProxyType({
+                sys.intern(diplo): sys.intern(pheno) for diplo, pheno in sub.items()
+            })
+            for gene, sub in phenotype_map.items()
+        }),
+        _drug_gene_map=MappingProxyType({
+            sys.intern(drug): sys.intern(gene) for drug, gene in drug_gene_map.items()
+        }),
     )
 
     logger.info("CPIC data ready. Summary: %s", _cpic_singleton.summary())
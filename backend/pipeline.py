@@ -10,14 +10,21 @@ Pipeline steps (no dosing in Phase 1A):
                                    resolved_phenotype = phenotype_map[primary_gene][diplotype]
   4.  Return PipelineResult (structured dataclass).
 
+run_pipeline_batch() applies the same steps to a cohort of patients sharing one
+drug list, resolving each drug and each (gene, diplotype) pair once per batch.
+run_pipeline_json() builds the to_dict() shape directly and wraps it in a
+PipelineResultView, which creates the dataclasses only if they are accessed.
+
 No ML. No AI. No Gemini. Purely deterministic rule lookup.
 """
 
 from __future__ import annotations
 
 import logging
+import sys
 from dataclasses import dataclass, field
-from typing import Any, Dict, List, Optional
+from operator import attrgetter, itemgetter
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
 
 from cpic_loader import CPICData, load_cpic_data
 
@@ -27,21 +34,42 @@ logger = logging.getLogger(__name__)
 # Data structures
 # ---------------------------------------------------------------------------
 
-# Target genes that this phase processes
-TARGET_GENES: List[str] = [
+# Target genes that this phase processes.  Interned, like the gene names in
+# the loaded CPIC maps, so set/dict probes between them hit on identity.
+TARGET_GENES: Tuple[str, ...] = tuple(sys.intern(g) for g in (
     "CYP2D6",
     "CYP2C19",
     "CYP2C9",
     "SLCO1B1",
     "TPMT",
     "DPYD",
-]
+))
+
+TARGET_GENES_SET: FrozenSet[str] = frozenset(TARGET_GENES)
+
+# GENE → position in TARGET_GENES
+GENE_INDEX: Dict[str, int] = {g: i for i, g in enumerate(TARGET_GENES)}
 
 # Default diplotype when no variants are found for a gene (homozygous reference)
-_DEFAULT_DIPLOTYPE = "*1/*1"
+_DEFAULT_DIPLOTYPE = sys.intern("*1/*1")
+
+# (primary_gene, diplotype_used, phenotype, gene_found_in_vcf) for unmapped drugs
+_UNKNOWN_DRUG_ROW = ("Unknown", "N/A", "Unknown", False)
+
+# Row layouts for PipelineResult.to_dict(raw=True)
+GENE_FIELDS = ("gene", "diplotype", "phenotype")
+DRUG_FIELDS = ("drug", "primary_gene", "diplotype_used", "phenotype", "gene_found_in_vcf")
+_GeneRow = Tuple[str, str, str]
+_DrugRow = Tuple[str, str, str, str, bool]
+_CoreResult = Tuple[List[_GeneRow], List[_DrugRow], Dict[str, Any]]
 
+_get_gene_row = attrgetter(*GENE_FIELDS)
+_get_drug_row = attrgetter(*DRUG_FIELDS)
+_get_gene_item = itemgetter(*GENE_FIELDS)
+_get_drug_item = itemgetter(*DRUG_FIELDS)
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class GeneResult:
     """Resolved phenotype for a single gene."""
 
@@ -50,7 +78,7 @@ class GeneResult:
     phenotype: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DrugResult:
     """Pharmacogenomic resolution for a single drug."""
 
@@ -61,7 +89,7 @@ class DrugResult:
     gene_found_in_vcf: bool  # True if gene had a variant in the VCF input
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class PipelineResult:
     """Full output for one patient analysis run."""
 
@@ -71,28 +99,95 @@ class PipelineResult:
 
     quality_metrics: Dict[str, Any] = field(default_factory=dict)
 
-    def to_dict(self) -> dict:
-        """Serialise to a plain dict (JSON-safe)."""
+    # Memoised as_dict; filled on first access (slots rule out cached_property)
+    _cached_dict: Optional[dict] = field(default=None, init=False, repr=False, compare=False)
+
+    @property
+    def as_dict(self) -> dict:
+        """Keyed to_dict() output, built on first access and then reused.
+
+        For callers that read the dict several times (serialise, log,
+        respond).  The same dict is returned on every access, so do not
+        modify it; it is a snapshot and does not follow later changes to
+        gene_profiles / drug_results.  to_dict() returns a new dict instead.
+        """
+        cached = self._cached_dict
+        if cached is None:
+            cached = self._build_dict()
+            object.__setattr__(self, "_cached_dict", cached)
+        return cached
+
+    def to_dict(self, raw: bool = False) -> dict:
+        """Serialise to a new plain dict (JSON-safe; str/bool/list/tuple/dict
+        only, so orjson.dumps encodes it natively).
+
+        With raw=True each gene/drug row is a tuple in field order
+        (see GENE_FIELDS / DRUG_FIELDS) instead of a keyed dict.
+        """
+        return self._build_dict(raw)
+
+    def _build_dict(self, raw: bool = False) -> dict:
+        gene_rows: list = list(map(_get_gene_row, self.gene_profiles))
+        drug_rows: list = list(map(_get_drug_row, self.drug_results))
+        if not raw:
+            gene_rows = [dict(zip(GENE_FIELDS, row)) for row in gene_rows]
+            drug_rows = [dict(zip(DRUG_FIELDS, row)) for row in drug_rows]
         return {
             "patient_id": self.patient_id,
-            "gene_profiles": [
-                {
-                    "gene": g.gene,
-                    "diplotype": g.diplotype,
-                    "phenotype": g.phenotype,
-                }
-                for g in self.gene_profiles
-            ],
-            "drug_results": [
-                {
-                    "drug": d.drug,
-                    "primary_gene": d.primary_gene,
-                    "diplotype_used": d.diplotype_used,
-                    "phenotype": d.phenotype,
-                    "gene_found_in_vcf": d.gene_found_in_vcf,
-                }
-                for d in self.drug_results
-            ],
+            "gene_profiles": gene_rows,
+            "drug_results": drug_rows,
+            "quality_metrics": self.quality_metrics,
+        }
+
+
+class PipelineResultView:
+    """Lazy stand-in for PipelineResult, returned by run_pipeline_json().
+
+    Supports patient_id, quality_metrics, gene_profiles, drug_results,
+    as_dict and to_dict(raw=False), each with the same meaning as on
+    PipelineResult.  as_dict is the dict built by the pipeline;
+    gene_profiles / drug_results are materialised as GeneResult / DrugResult
+    objects only on first access.  It is not a PipelineResult subclass and
+    has no value equality or field repr — compare to_dict() output instead.
+    """
+
+    __slots__ = ("patient_id", "quality_metrics", "_dict", "_gene_objs", "_drug_objs")
+
+    def __init__(self, result_dict: dict) -> None:
+        self.patient_id: str = result_dict["patient_id"]
+        self.quality_metrics: Dict[str, Any] = result_dict["quality_metrics"]
+        self._dict = result_dict
+        self._gene_objs: Optional[List[GeneResult]] = None
+        self._drug_objs: Optional[List[DrugResult]] = None
+
+    @property
+    def gene_profiles(self) -> List[GeneResult]:
+        if self._gene_objs is None:
+            self._gene_objs = [GeneResult(**g) for g in self._dict["gene_profiles"]]
+        return self._gene_objs
+
+    @property
+    def drug_results(self) -> List[DrugResult]:
+        if self._drug_objs is None:
+            self._drug_objs = [DrugResult(**d) for d in self._dict["drug_results"]]
+        return self._drug_objs
+
+    @property
+    def as_dict(self) -> dict:
+        """The dict built by the pipeline; the same dict on every access, so
+        do not modify it."""
+        return self._dict
+
+    def to_dict(self, raw: bool = False) -> dict:
+        """Serialise to a new plain dict; see PipelineResult.to_dict()."""
+        if raw:
+            gene_row, drug_row = _get_gene_item, _get_drug_item
+        else:
+            gene_row = drug_row = dict
+        return {
+            "patient_id": self.patient_id,
+            "gene_profiles": list(map(gene_row, self._dict["gene_profiles"])),
+            "drug_results": list(map(drug_row, self._dict["drug_results"])),
             "quality_metrics": self.quality_metrics,
         }
 
@@ -125,75 +220,176 @@ def run_pipeline(
     if cpic is None:
         cpic = load_cpic_data()
 
+    return _build_result(patient_id, _resolve_core(
+        vcf_diplotypes, len(drugs), _resolve_drugs(drugs, cpic), cpic.phenotype_lookup,
+    ))
+
+
+def run_pipeline_json(
+    patient_id: str,
+    vcf_diplotypes: Dict[str, str],
+    drugs: List[str],
+    cpic: Optional[CPICData] = None,
+) -> PipelineResultView:
+    """Like run_pipeline(), but builds the to_dict() form directly.
+
+    For callers that mostly serialise the result (e.g. an HTTP handler):
+    no dataclasses are created unless the view's gene_profiles /
+    drug_results are accessed, and the view's as_dict is the built dict
+    itself.  Arguments are the same as run_pipeline().
+    """
+    if cpic is None:
+        cpic = load_cpic_data()
+
+    gene_rows, drug_rows, quality_metrics = _resolve_core(
+        vcf_diplotypes, len(drugs), _resolve_drugs(drugs, cpic), cpic.phenotype_lookup,
+    )
+    return PipelineResultView({
+        "patient_id": patient_id,
+        "gene_profiles": [dict(zip(GENE_FIELDS, row)) for row in gene_rows],
+        "drug_results": [dict(zip(DRUG_FIELDS, row)) for row in drug_rows],
+        "quality_metrics": quality_metrics,
+    })
+
+
+def run_pipeline_batch(
+    patients: Sequence[Tuple[str, Dict[str, str]]],
+    drugs: List[str],
+    cpic: Optional[CPICData] = None,
+) -> List[PipelineResult]:
+    """Run the Phase 1A pipeline for a cohort sharing one drug list.
+
+    Equivalent to calling run_pipeline() once per patient, but each drug is
+    resolved to its primary gene once per batch and each distinct
+    (gene, diplotype) pair is looked up once per batch.
+
+    Args:
+        patients:  Sequence of (patient_id, vcf_diplotypes) pairs; see
+                   run_pipeline() for the vcf_diplotypes format.
+        drugs:     Drug names to analyse for every patient (any case).
+        cpic:      Optional pre-loaded CPICData instance.
+
+    Returns:
+        One PipelineResult per patient, in input order.
+    """
+    if cpic is None:
+        cpic = load_cpic_data()
+
+    resolved_drugs = _resolve_drugs(drugs, cpic)
+
+    phenotype_cache: Dict[Tuple[str, str], str] = {}
+
+    def lookup(gene: str, diplotype: str) -> str:
+        key = (gene, diplotype)
+        phenotype = phenotype_cache.get(key)
+        if phenotype is None:
+            phenotype = phenotype_cache[key] = cpic.phenotype_lookup(gene, diplotype)
+        return phenotype
+
+    return [
+        _build_result(
+            patient_id, _resolve_core(vcf_diplotypes, len(drugs), resolved_drugs, lookup),
+        )
+        for patient_id, vcf_diplotypes in patients
+    ]
+
+
+def _resolve_drugs(drugs: List[str], cpic: CPICData) -> List[Tuple[str, str]]:
+    """Normalise drug names and pair each with its primary gene (or "Unknown")."""
+    drugs_norm = list(map(str.upper, map(str.strip, drugs)))
+    return list(zip(drugs_norm, cpic.drug_gene_lookup_many(drugs_norm)))
+
+
+def _build_result(patient_id: str, core: _CoreResult) -> PipelineResult:
+    """Wrap _resolve_core() output in the PipelineResult dataclasses."""
+    gene_rows, drug_rows, quality_metrics = core
+    return PipelineResult(
+        patient_id=patient_id,
+        gene_profiles=[GeneResult(*row) for row in gene_rows],
+        drug_results=[DrugResult(*row) for row in drug_rows],
+        quality_metrics=quality_metrics,
+    )
+
+
+def _resolve_core(
+    vcf_diplotypes: Dict[str, str],
+    drugs_requested: int,
+    resolved_drugs: List[Tuple[str, str]],
+    phenotype_lookup: Callable[[str, str], str],
+) -> _CoreResult:
+    """Pipeline body for one patient, given (DRUG, primary_gene) pairs.
+
+    Returns (gene_rows, drug_rows, quality_metrics), rows being tuples in
+    GENE_FIELDS / DRUG_FIELDS order.
+    """
+    # Level checks hoisted out of the loops so filtered calls build no args
+    debug_on = logger.isEnabledFor(logging.DEBUG)
+    info_on = logger.isEnabledFor(logging.INFO)
+
     # -----------------------------------------------------------------------
     # Step 1: Resolve phenotype for every target gene
     # -----------------------------------------------------------------------
-    gene_profiles: List[GeneResult] = []
-    gene_phenotype_cache: Dict[str, str] = {}   # GENE → phenotype (fast lookup)
+    gene_rows: List[_GeneRow] = []
+    gene_phenos = ["Unknown"] * len(TARGET_GENES)   # indexed via GENE_INDEX
+    unknown_phenotypes = 0
 
-    for gene in TARGET_GENES:
+    for i, gene in enumerate(TARGET_GENES):
         diplotype = vcf_diplotypes.get(gene, _DEFAULT_DIPLOTYPE)
-        phenotype = cpic.phenotype_lookup(gene, diplotype)
-        gene_phenotype_cache[gene] = phenotype
-        gene_profiles.append(GeneResult(gene=gene, diplotype=diplotype, phenotype=phenotype))
-        logger.debug("Gene %s | diplotype %s | phenotype %s", gene, diplotype, phenotype)
+        phenotype = phenotype_lookup(gene, diplotype)
+        if phenotype == "Unknown":
+            unknown_phenotypes += 1
+        gene_phenos[i] = phenotype
+        gene_rows.append((gene, diplotype, phenotype))
+        if debug_on:
+            logger.debug("Gene %s | diplotype %s | phenotype %s", gene, diplotype, phenotype)
 
     # -----------------------------------------------------------------------
     # Step 2: Resolve drug → gene → phenotype
     # -----------------------------------------------------------------------
-    drug_results: List[DrugResult] = []
-    genes_from_vcf = {g.upper() for g in vcf_diplotypes.keys()}
-
-    for drug_raw in drugs:
-        drug = drug_raw.strip().upper()
-        primary_gene = cpic.drug_gene_lookup(drug)
+    drug_rows: List[_DrugRow] = []
+    drugs_resolved = drugs_unknown = 0
+    # Gene keys are documented as uppercase; only re-case them when they aren't
+    vcf_genes = vcf_diplotypes.keys()
+    genes_from_vcf = (
+        frozenset(vcf_genes) if all(map(str.isupper, vcf_genes))
+        else frozenset(map(str.upper, vcf_genes))
+    )
 
+    for drug, primary_gene in resolved_drugs:
         if primary_gene == "Unknown":
             # Drug not in CPIC dataset — record faithfully with Unknown values
-            drug_results.append(
-                DrugResult(
-                    drug=drug,
-                    primary_gene="Unknown",
-                    diplotype_used="N/A",
-                    phenotype="Unknown",
-                    gene_found_in_vcf=False,
-                )
-            )
+            drug_rows.append((drug, *_UNKNOWN_DRUG_ROW))
+            drugs_unknown += 1
             logger.warning("Drug '%s' has no CPIC gene mapping; skipping.", drug)
             continue
 
         diplotype_used = vcf_diplotypes.get(primary_gene, _DEFAULT_DIPLOTYPE)
-        phenotype = gene_phenotype_cache.get(primary_gene, "Unknown")
-
-        drug_results.append(
-            DrugResult(
-                drug=drug,
-                primary_gene=primary_gene,
-                diplotype_used=diplotype_used,
-                phenotype=phenotype,
-                gene_found_in_vcf=primary_gene in genes_from_vcf,
-            )
+        idx = GENE_INDEX.get(primary_gene)
+        phenotype = (
+            gene_phenos[idx] if idx is not None
+            else phenotype_lookup(primary_gene, diplotype_used)
         )
-        logger.info(
-            "Drug %s → gene %s | diplotype %s | phenotype %s",
-            drug, primary_gene, diplotype_used, phenotype,
+
+        drug_rows.append(
+            (drug, primary_gene, diplotype_used, phenotype, primary_gene in genes_from_vcf)
         )
+        drugs_resolved += 1
+        if info_on:
+            logger.info(
+                "Drug %s → gene %s | diplotype %s | phenotype %s",
+                drug, primary_gene, diplotype_used, phenotype,
+            )
 
     # -----------------------------------------------------------------------
     # Quality metrics
     # -----------------------------------------------------------------------
     quality_metrics = {
-        "genes_resolved": len(gene_profiles),
-        "genes_with_vcf_data": len(genes_from_vcf & set(TARGET_GENES)),
-        "drugs_requested": len(drugs),
-        "drugs_resolved": sum(1 for d in drug_results if d.primary_gene != "Unknown"),
-        "drugs_unknown": sum(1 for d in drug_results if d.primary_gene == "Unknown"),
-        "unknown_phenotypes": sum(1 for g in gene_profiles if g.phenotype == "Unknown"),
+        "genes_resolved": len(gene_rows),
+        "genes_with_vcf_data": len(genes_from_vcf & TARGET_GENES_SET),
+        "drugs_requested": drugs_requested,
+        "drugs_resolved": drugs_resolved,
+        "drugs_unknown": drugs_unknown,
+        "unknown_phenotypes": unknown_phenotypes,
     }
 
-    return PipelineResult(
-        patient_id=patient_id,
-        gene_profiles=gene_profiles,
-        drug_results=drug_results,
-        quality_metrics=quality_metrics,
-    )
+    return gene_rows, drug_rows, quality_metrics
@@ -16,12 +16,16 @@ Run with:
 """
 
 import csv
+import json
 import os
 import sys
 import tempfile
 import unittest
+from collections import defaultdict
+from operator import itemgetter
 from pathlib import Path
 from typing import ClassVar
+from unittest import mock
 
 # Ensure the backend directory is on the path so imports work from anywhere
 sys.path.insert(0, str(Path(__file__).parent))
@@ -60,6 +64,19 @@ def _write_drug_gene_csv(path: Path, rows: list[dict]) -> None:
         writer.writerows(rows)
 
 
+def _no_precomputed_cache():
+    """Bypass the precomputed cache, so loading the real data/ folder never
+    writes into the source tree."""
+    return mock.patch.multiple(
+        loader,
+        _load_precomputed=lambda *args: None,
+        _write_precomputed=lambda *args: None,
+    )
+
+
+_get_phenotype_fields = itemgetter("gene", "diplotype", "phenotype_summary")
+
+
 def _make_cpic_data(phenotype_rows: list[dict], drug_rows: list[dict]) -> CPICData:
     """Create a CPICData instance directly from in-memory row lists.
 
@@ -67,15 +84,10 @@ def _make_cpic_data(phenotype_rows: list[dict], drug_rows: list[dict]) -> CPICDa
     construct it directly without writing temporary CSV files.
     """
     reset_cpic_data()
-    pmap: dict = {}
-    for row in phenotype_rows:
-        gene    = row["gene"].strip().upper()
-        diplo   = row["diplotype"].strip()
+    pmap: defaultdict = defaultdict(dict)
+    for gene, diplo, pheno in map(_get_phenotype_fields, phenotype_rows):
         # Normalise diplotype the same way the loader does
-        from cpic_loader import _normalize_diplotype
-        diplo   = _normalize_diplotype(diplo)
-        pheno   = row["phenotype_summary"].strip().upper()
-        pmap.setdefault(gene, {})[diplo] = pheno
+        pmap[gene.strip().upper()][_normalize_diplotype(diplo.strip())] = pheno.strip().upper()
 
     dgmap: dict = {}
     for row in drug_rows:
@@ -85,7 +97,7 @@ def _make_cpic_data(phenotype_rows: list[dict], drug_rows: list[dict]) -> CPICDa
             dgmap[drug] = gene
 
     # Bypass load_cpic_data() and construct the frozen dataclass directly
-    return CPICData(_phenotype_map=pmap, _drug_gene_map=dgmap)
+    return CPICData(_phenotype_map=dict(pmap), _drug_gene_map=dgmap)
 
 
 # ---------------------------------------------------------------------------
@@ -247,6 +259,13 @@ class TestDrugGeneLookup(unittest.TestCase):
     def test_empty_drug_returns_unknown(self):
         self.assertEqual(self.cpic.drug_gene_lookup(""), "Unknown")
 
+    def test_lookup_many_matches_single_lookups(self):
+        drugs = ["codeine", " Warfarin ", "ASPIRIN", "", "SIMVASTATIN"]
+        self.assertEqual(
+            self.cpic.drug_gene_lookup_many(drugs),
+            [self.cpic.drug_gene_lookup(d) for d in drugs],
+        )
+
 
 # ---------------------------------------------------------------------------
 # D. Startup & column validation (fail-fast)
@@ -334,15 +353,164 @@ class TestStartupValidation(unittest.TestCase):
             with self.assertRaises(CPICDataError):
                 load_cpic_data(data_dir=d)
 
+    def test_relationships_scan_validates_columns_when_enabled(self):
+        """With SCAN_RELATIONSHIPS on, a malformed relationships.csv must raise."""
+        with tempfile.TemporaryDirectory() as tmp:
+            d = Path(tmp)
+            self._write_dpyd_csv(d / "DPYD_Diplotype_Phenotype_Table.csv")
+            (d / "relationships.csv").write_text("Entity1_name,Association\nCYP2D6,associated\n")
+            with mock.patch.object(loader, "SCAN_RELATIONSHIPS", False):
+                self.assertEqual(load_cpic_data(data_dir=d).drug_gene_lookup("CODEINE"), "CYP2D6")
+            reset_cpic_data()
+            with mock.patch.object(loader, "SCAN_RELATIONSHIPS", True):
+                with self.assertRaises(CPICDataError):
+                    load_cpic_data(data_dir=d)
+
+    def test_relationships_scan_resolves_drugs_when_enabled(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            d = Path(tmp)
+            self._write_dpyd_csv(d / "DPYD_Diplotype_Phenotype_Table.csv")
+            self._write_rel_csv(d / "relationships.csv")
+            with mock.patch.object(loader, "SCAN_RELATIONSHIPS", True):
+                cpic = load_cpic_data(data_dir=d)
+            self.assertEqual(cpic.drug_gene_lookup("codeine"), "CYP2D6")
+            self.assertEqual(cpic.summary()["drugs_loaded"], len(loader._CPIC_DRUG_GENE))
+
+    def test_precomputed_cache_written_and_reused(self):
+        """A successful parse writes the cache; the next load skips the CSVs."""
+        with tempfile.TemporaryDirectory() as tmp:
+            d = Path(tmp)
+            self._write_dpyd_csv(d / "DPYD_Diplotype_Phenotype_Table.csv")
+            self._write_rel_csv(d / "relationships.csv")
+            parsed = load_cpic_data(data_dir=d)
+            cached = json.loads((d / loader._PRECOMPUTED_NAME).read_text(encoding="utf-8"))
+            self.assertEqual(cached["drug_gene_map"]["CODEINE"], "CYP2D6")
+
+            reset_cpic_data()
+            with mock.patch.object(loader, "_parse_dpyd_csv", side_effect=AssertionError):
+                reloaded = load_cpic_data(data_dir=d)
+            self.assertEqual(reloaded.summary(), parsed.summary())
+            self.assertEqual(reloaded._phenotype_map["DPYD"]["Reference/Reference"], "NM")
+
+    def test_stale_precomputed_cache_ignored(self):
+        """Changing a source CSV must force a re-parse (and its validation)."""
+        with tempfile.TemporaryDirectory() as tmp:
+            d = Path(tmp)
+            self._write_dpyd_csv(d / "DPYD_Diplotype_Phenotype_Table.csv")
+            self._write_rel_csv(d / "relationships.csv")
+            load_cpic_data(data_dir=d)
+
+            reset_cpic_data()
+            self._write_dpyd_csv(d / "DPYD_Diplotype_Phenotype_Table.csv", bad_columns=True)
+            with self.assertRaises(CPICDataError):
+                load_cpic_data(data_dir=d)
+
+    def test_precomputed_cache_invalidated_by_embedded_tables(self):
+        """Editing the embedded CPIC tables must force a re-parse, CSVs untouched."""
+        with tempfile.TemporaryDirectory() as tmp:
+            d = Path(tmp)
+            self._write_dpyd_csv(d / "DPYD_Diplotype_Phenotype_Table.csv")
+            self._write_rel_csv(d / "relationships.csv")
+            load_cpic_data(data_dir=d)
+
+            reset_cpic_data()
+            with mock.patch.dict(loader._CPIC_DRUG_GENE, {"CODEINE": ("CYP2C19", "A")}), \
+                 mock.patch.dict(loader._STAR_ALLELE_PHENOTYPE_MAP["CYP2D6"], {"*1/*4": "PM"}):
+                reloaded = load_cpic_data(data_dir=d)
+            self.assertEqual(reloaded.drug_gene_lookup("CODEINE"), "CYP2C19")
+            self.assertEqual(reloaded.phenotype_lookup("CYP2D6", "*1/*4"), "PM")
+
+    def test_precomputed_cache_invalidated_by_loader_source(self):
+        """A release that changes only the parser code must force a re-parse."""
+        def new_parser(dpyd_csv):
+            yield "DPYD", "Reference/Reference", "IM"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            d = Path(tmp)
+            self._write_dpyd_csv(d / "DPYD_Diplotype_Phenotype_Table.csv")
+            self._write_rel_csv(d / "relationships.csv")
+            load_cpic_data(data_dir=d)
+
+            reset_cpic_data()
+            new_source = d / "cpic_loader.py"
+            new_source.write_bytes(loader._LOADER_SOURCE.read_bytes() + b"# parser changed\n")
+            with mock.patch.object(loader, "_LOADER_SOURCE", new_source), \
+                 mock.patch.object(loader, "_parse_dpyd_csv", new_parser):
+                reloaded = load_cpic_data(data_dir=d)
+            self.assertEqual(reloaded._phenotype_map["DPYD"]["Reference/Reference"], "IM")
+
+    def test_failed_cache_write_leaves_no_temp_file(self):
+        """A cache write that fails is only warned about and cleans up after itself."""
+        with tempfile.TemporaryDirectory() as tmp:
+            d = Path(tmp)
+            self._write_dpyd_csv(d / "DPYD_Diplotype_Phenotype_Table.csv")
+            self._write_rel_csv(d / "relationships.csv")
+            with mock.patch.object(loader.os, "replace", side_effect=OSError("busy")):
+                cpic = load_cpic_data(data_dir=d)
+            self.assertEqual(cpic.drug_gene_lookup("CODEINE"), "CYP2D6")
+            self.assertEqual(
+                sorted(p.name for p in d.iterdir()),
+                ["DPYD_Diplotype_Phenotype_Table.csv", "relationships.csv"],
+            )
+
+    def test_malformed_precomputed_cache_ignored(self):
+        """A cache file that is not the expected JSON layout falls back to parsing."""
+        with tempfile.TemporaryDirectory() as tmp:
+            d = Path(tmp)
+            self._write_dpyd_csv(d / "DPYD_Diplotype_Phenotype_Table.csv")
+            self._write_rel_csv(d / "relationships.csv")
+            (d / loader._PRECOMPUTED_NAME).write_text("raise SystemExit(1)\n")
+            cpic = load_cpic_data(data_dir=d)
+            self.assertEqual(cpic.drug_gene_lookup("CODEINE"), "CYP2D6")
+
     def test_singleton_not_reloaded(self):
         """Calling load_cpic_data twice should return the same object."""
         real_data_dir = Path(__file__).parent.parent / "data"
         if not real_data_dir.exists():
             self.skipTest("data/ folder not found.")
-        first  = load_cpic_data(data_dir=real_data_dir)
-        second = load_cpic_data(data_dir=real_data_dir)
+        with _no_precomputed_cache():
+            first  = load_cpic_data(data_dir=real_data_dir)
+            second = load_cpic_data(data_dir=real_data_dir)
         self.assertIs(first, second, "Singleton violated: different objects returned")
 
+    def test_loaded_maps_are_read_only(self):
+        """The singleton's lookup tables must reject mutation."""
+        real_data_dir = Path(__file__).parent.parent / "data"
+        if not real_data_dir.exists():
+            self.skipTest("data/ folder not found.")
+        with _no_precomputed_cache():
+            cpic = load_cpic_data(data_dir=real_data_dir)
+        with self.assertRaises(TypeError):
+            cpic._drug_gene_map["ASPIRIN"] = "CYP2D6"  # type: ignore[index]
+        with self.assertRaises(TypeError):
+            cpic._phenotype_map["CYP2D6"]["*1/*1"] = "PM"  # type: ignore[index]
+
+    def test_load_leaves_diplotype_cache_empty(self):
+        """Building CPICData must not fill the diplotype LRU with table keys."""
+        real_data_dir = Path(__file__).parent.parent / "data"
+        if not real_data_dir.exists():
+            self.skipTest("data/ folder not found.")
+        loader._slow_normalize_diplotype.cache_clear()
+        with _no_precomputed_cache():
+            load_cpic_data(data_dir=real_data_dir)
+        self.assertEqual(loader._slow_normalize_diplotype.cache_info().currsize, 0)
+
+    def test_fast_path_matches_normalising_lookup(self):
+        """Every stored spelling (as written, swapped, lowercased) must resolve
+        exactly as the normalising path does — DPYD keys included."""
+        real_data_dir = Path(__file__).parent.parent / "data"
+        if not real_data_dir.exists():
+            self.skipTest("data/ folder not found.")
+        with _no_precomputed_cache():
+            cpic = load_cpic_data(data_dir=real_data_dir)
+        for gene, diplo in cpic._flat_phenotypes:
+            left, _, right = diplo.partition("/")
+            for spelling in (diplo, f"{right}/{left}", diplo.lower()):
+                expected = cpic._flat_phenotypes.get(
+                    (_normalize_gene(gene), _normalize_diplotype(spelling)), "Unknown"
+                )
+                self.assertEqual(cpic.phenotype_lookup(gene, spelling), expected)
+
 
 # ---------------------------------------------------------------------------
 # E. Pipeline integration (end-to-end)
@@ -362,7 +530,8 @@ class TestPipelineIntegration(unittest.TestCase):
                 f"data/ dir not found at {real_data_dir}. "
                 "Skipping integration tests."
             )
-        cls.cpic = load_cpic_data(data_dir=real_data_dir)
+        with _no_precomputed_cache():
+            cls.cpic = load_cpic_data(data_dir=real_data_dir)
 
     @classmethod
     def tearDownClass(cls):
@@ -421,11 +590,84 @@ class TestPipelineIntegration(unittest.TestCase):
         self.assertEqual(qm["drugs_resolved"], 1)
         self.assertEqual(qm["drugs_unknown"],  1)
 
+    def test_default_cpic_follows_loader_reset(self):
+        """With cpic=None the pipeline uses whatever the loader holds now."""
+        from pipeline import run_pipeline
+        first = _make_cpic_data([], [{"gene": "CYP2C9", "drug_name": "WARFARIN"}])
+        second = _make_cpic_data([], [{"gene": "TPMT", "drug_name": "WARFARIN"}])
+        with mock.patch.object(loader, "_cpic_singleton", first):
+            result = run_pipeline("P1", {}, ["WARFARIN"])
+            self.assertEqual(result.drug_results[0].primary_gene, "CYP2C9")
+            reset_cpic_data()
+            loader._cpic_singleton = second
+            result = run_pipeline("P1", {}, ["WARFARIN"])
+            self.assertEqual(result.drug_results[0].primary_gene, "TPMT")
+
+    def test_batch_matches_single_runs(self):
+        from pipeline import run_pipeline, run_pipeline_batch
+        patients = [
+            ("P1", {"CYP2C9": "*2/*3"}),
+            ("P2", {"CYP2C19": "*1/*17", "CYP2D6": "*4/*1"}),
+            ("P3", {}),
+        ]
+        drugs = ["warfarin", "CLOPIDOGREL", "Codeine", "UNKNOWNDRUG"]
+        batch = run_pipeline_batch(patients, drugs, cpic=self.cpic)
+        self.assertEqual(len(batch), len(patients))
+        for (patient_id, vcf), result in zip(patients, batch):
+            single = run_pipeline(patient_id, vcf, drugs, cpic=self.cpic)
+            self.assertEqual(result.to_dict(), single.to_dict())
+
+    def test_json_fast_path_matches_to_dict(self):
+        from pipeline import run_pipeline_json
+        vcf, drugs = {"CYP2C9": "*2/*3", "CYP2D6": "*1/*4"}, ["WARFARIN", "codeine", "NOPE"]
+        view = run_pipeline_json("TEST-INT-001", vcf, drugs, cpic=self.cpic)
+        result = self._run(vcf, drugs)
+        self.assertEqual(view.to_dict(), result.to_dict())
+        self.assertEqual(view.to_dict(raw=True), result.to_dict(raw=True))
+        self.assertEqual(view.as_dict, result.as_dict)
+        self.assertIs(view.as_dict, view.as_dict)
+        self.assertIsNot(view.to_dict(), view.to_dict())
+        self.assertEqual(view.quality_metrics, result.quality_metrics)
+        self.assertEqual(view.gene_profiles, result.gene_profiles)
+        self.assertEqual(view.drug_results, result.drug_results)
+        self.assertIs(view.drug_results, view.drug_results)
+
+    def test_to_dict_raw_rows_follow_field_order(self):
+        from pipeline import DRUG_FIELDS, GENE_FIELDS
+        result = self._run({"CYP2C9": "*2/*3"}, ["WARFARIN"])
+        keyed, raw = result.to_dict(), result.to_dict(raw=True)
+        for key, fields in (("gene_profiles", GENE_FIELDS), ("drug_results", DRUG_FIELDS)):
+            self.assertEqual([dict(zip(fields, row)) for row in raw[key]], keyed[key])
+
+    def test_as_dict_is_built_once(self):
+        result = self._run({"CYP2C9": "*2/*3"}, ["WARFARIN"])
+        self.assertIs(result.as_dict, result.as_dict)
+        self.assertEqual(result.as_dict, result.to_dict())
+
+    def test_to_dict_returns_a_new_dict(self):
+        result = self._run({"CYP2C9": "*2/*3"}, ["WARFARIN"])
+        first = result.to_dict()
+        first["extra"] = True
+        first["drug_results"].clear()
+        self.assertNotIn("extra", result.to_dict())
+        self.assertEqual(len(result.to_dict()["drug_results"]), 1)
+        self.assertNotIn("extra", result.as_dict)
+
+    def test_results_are_immutable(self):
+        import dataclasses
+        result = self._run({}, ["WARFARIN"])
+        with self.assertRaises(dataclasses.FrozenInstanceError):
+            result.drug_results[0].phenotype = "PM"  # type: ignore[misc]
+
     def test_to_dict_is_json_serialisable(self):
-        import json
+        try:
+            from orjson import dumps  # stricter than json; checked when installed
+        except ImportError:
+            from json import dumps  # type: ignore[assignment]
         result = self._run({"CYP2C9": "*2/*3"}, ["WARFARIN"])
         try:
-            json.dumps(result.to_dict())
+            dumps(result.to_dict())
+            dumps(result.to_dict(raw=True))
         except (TypeError, ValueError) as exc:
             self.fail(f"to_dict() is not JSON-serialisable: {exc}")
 